@@ -20,6 +20,13 @@ API_KEY = os.getenv("OPENWEBUI_API_KEY")
 MODEL = os.getenv("OPENWEBUI_MODEL")
 MULTIMODAL_MODEL = os.getenv("OPENWEBUI_MULTIMODAL_MODEL")
 
+# Matches [n] style citations in a response
+_CITATION_RE = re.compile(r'\[\d+\]')
+# Matches everything from the first '{' to the last '}'
+_JSON_BLOCK_RE = re.compile(r'\{.*\}', re.DOTALL)
+# White canvas copied for every dummy image, so it is only filled once
+_BLANK_IMAGE = Image.new('RGB', (200, 200), color='white')
+
 
 # --- Helper Functions ---
 def print_header(title):
@@ -31,7 +38,7 @@ def print_header(title):
 
 def create_dummy_image(file_path: str, shape: str, color: str):
     """Creates a simple image with a geometric shape."""
-    img = Image.new('RGB', (200, 200), color='white')
+    img = _BLANK_IMAGE.copy()
     draw = ImageDraw.Draw(img)
     if shape == "square":
         draw.rectangle([50, 50, 150, 150], fill=color)
@@ -69,6 +76,30 @@ def create_dummy_docx(file_path: str, title: str, text_lines: list):
     print(f"Generated dummy DOCX: {file_path}")
 
 
+def wrap_chunk(content: str, current_column: int, wrap_width: int):
+    """
+    Inserts line breaks into a chunk of streamed text so no line exceeds wrap_width.
+
+    Returns the wrapped text and the output column after writing it.
+    """
+    pieces = []
+    for index, line in enumerate(content.split('\n')):
+        if index:
+            pieces.append('\n')
+            current_column = 0
+        start = 0
+        # Cut the line into slices that fill up the rest of the current row
+        while len(line) - start >= wrap_width - current_column:
+            end = start + wrap_width - current_column
+            pieces.append(line[start:end])
+            pieces.append('\n')
+            start = end
+            current_column = 0
+        pieces.append(line[start:])
+        current_column += len(line) - start
+    return ''.join(pieces), current_column
+
+
 def stream_and_print_response(stream_generator, wrap_width=120):
     """
     Streams a response, prints it with live line-wrapping, and returns the full content.
@@ -86,15 +117,10 @@ def stream_and_print_response(stream_generator, wrap_width=120):
 
         if content:
             full_response += content
-            for char in content:
-                print(char, end="", flush=True)
-                if char == '\n':
-                    current_column = 0
-                else:
-                    current_column += 1
-                if current_column >= wrap_width:
-                    print()
-                    current_column = 0
+            # Write each chunk with a single call instead of one print per character
+            wrapped, current_column = wrap_chunk(content, current_column, wrap_width)
+            sys.stdout.write(wrapped)
+            sys.stdout.flush()
     print()
     return full_response
 
@@ -103,13 +129,14 @@ def print_source_references_if_any(response_text: str, uploaded_files: list):
     """
     Checks for [n] style citations in the response and prints the corresponding source files.
     """
-    citations = re.findall(r'\[\d+\]', response_text)
+    # Collect the distinct citations in a single pass
+    citations = dict.fromkeys(match.group(0) for match in _CITATION_RE.finditer(response_text))
     if not citations:
         return
 
     print("\n--- Source Documents ---")
     source_map = {f"[{i + 1}]": f['filename'] for i, f in enumerate(uploaded_files)}
-    unique_citations_in_text = sorted(list(set(citations)), key=lambda x: int(x.strip('[]')))
+    unique_citations_in_text = sorted(citations, key=lambda x: int(x.strip('[]')))
 
     for citation in unique_citations_in_text:
         if citation in source_map:
@@ -261,7 +288,7 @@ def use_case_6_robust_json_extraction(client: OpenWebUIClient):
         # 3. Proactively clean the output on the client side.
         # Find the first '{' and the last '}' to extract the JSON block.
         json_str = ""
-        match = re.search(r'\{.*\}', full_response, re.DOTALL)
+        match = _JSON_BLOCK_RE.search(full_response)
         if match:
             json_str = match.group(0)
             print("\nExtracted JSON block for validation:")
@@ -412,7 +439,7 @@ def use_case_11_single_file_query(client: OpenWebUIClient):
         prompt = "Summarize the attached document. What is the key objective and the final conclusion?"
         print(f"\nUser Query: {prompt}\n")
 
-        with client.upload_and_manage_files([pdf_path]) as uploaded_files:
+        with client.upload_and_manage_files([pdf_path], verbose=True) as uploaded_files:
             stream = client.stream_chat_completion(
                 model=MODEL,
                 messages=[{"role": "user", "content": prompt}],
@@ -441,7 +468,7 @@ def use_case_12_multi_file_conversation(client: OpenWebUIClient):
                           ["Attendees: Dr. Aris Thorne, Ben Carter.", "Decision: Ben Carter is lead engineer.",
                            "Risk: Supply chain delays."])
 
-        with client.upload_and_manage_files([pdf_path, docx_path]) as uploaded_files:
+        with client.upload_and_manage_files([pdf_path, docx_path], verbose=True) as uploaded_files:
             builder = OpenWebUIMessageBuilder()
             prompt1 = "Based on both documents, who is the team lead and who is the lead engineer?"
             print(f"User Query 1: {prompt1}\n")
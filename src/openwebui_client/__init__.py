@@ -1,4 +1,5 @@
+from .async_client import AsyncOpenWebUIClient
 from .client import OpenWebUIClient
 from .messagebuilder import OpenWebUIMessageBuilder
 
-__all__ = ["OpenWebUIClient", "OpenWebUIMessageBuilder"]
+__all__ = ["AsyncOpenWebUIClient", "OpenWebUIClient", "OpenWebUIMessageBuilder"]
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Open WebUI API Async Client Library
+
+This module provides `AsyncOpenWebUIClient`, an asyncio counterpart of
+`OpenWebUIClient` built on aiohttp. Its methods are coroutines, so several
+uploads and chat completions can run concurrently with `asyncio.gather`.
+"""
+
+import asyncio
+import logging
+import mimetypes
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional, AsyncIterator, Iterator, Union
+
+from .client import (_JSON_HEADERS, _MAX_WORKERS, _SSE_DONE, _SSE_SKIP, _chat_body,
+                     _chat_payload, _extract_delta_content, _feed_lines, _json_loads,
+                     _parse_sse_line)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+
+async def _iter_lines(content: 'aiohttp.StreamReader') -> AsyncIterator[bytes]:
+    """
+    Splits a response body into lines as data arrives, like the synchronous
+    client does.
+
+    Unlike iterating the StreamReader directly, this does not fail on lines
+    longer than aiohttp's read buffer, such as large RAG source events.
+    """
+    pending = bytearray()
+    async for chunk in content.iter_any():
+        for line in _feed_lines(pending, chunk):
+            yield line
+    if pending:
+        yield bytes(pending)
+
+
+def _async_body(body: Union[bytes, Iterator[bytes]]) -> Any:
+    """Adapts a request body from _chat_body() for aiohttp, which streams async iterables."""
+    if isinstance(body, bytes):
+        return body
+
+    async def chunks() -> AsyncIterator[bytes]:
+        for chunk in body:
+            yield chunk
+
+    return chunks()
+
+
+class AsyncOpenWebUIClient:
+    """
+    An asyncio client for interacting with the Open WebUI REST API.
+
+    Use it as an async context manager, so its connection pool is closed
+    when done:
+
+        async with AsyncOpenWebUIClient(base_url, api_key) as client:
+            models, answer = await asyncio.gather(client.get_models(),
+                                                  client.chat_completion(model, messages))
+    """
+
+    def __init__(self, base_url: str, api_key: str):
+        """
+        Initializes the client.
+
+        Args:
+            base_url: The base URL of the Open WebUI instance.
+            api_key: The API key used to authenticate requests.
+        """
+        if aiohttp is None:
+            raise ImportError("The async client requires aiohttp: pip install 'openwebui-client[async]'")
+        self.base_url = base_url.rstrip('/')
+        self._auth_header = f"Bearer {api_key}"
+        self._session: Optional['aiohttp.ClientSession'] = None
+
+    async def __aenter__(self) -> 'AsyncOpenWebUIClient':
+        self._get_session()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _get_session(self) -> 'aiohttp.ClientSession':
+        """Returns the client session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            # Like requests, apply no overall timeout, as completions can take long
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=75),
+                headers={"Authorization": self._auth_header},
+                timeout=aiohttp.ClientTimeout(total=None),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Closes the underlying connection pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def get_models(self) -> List[Dict[str, Any]]:
+        """Retrieves a list of available models from the API."""
+        url = f"{self.base_url}/api/models"
+        async with self._get_session().get(url) as response:
+            response.raise_for_status()
+            data = _json_loads(await response.read())
+        return data.get('data', [])
+
+    async def upload_file(self, file_path: str) -> Dict[str, Any]:
+        """
+        Uploads a file to be referenced in chat completions.
+        """
+        path = Path(file_path)
+
+        url = f"{self.base_url}/api/v1/files/"
+        mime_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+
+        # Let open() report a missing file instead of checking with a stat() first
+        try:
+            f = open(path, "rb")
+        except (FileNotFoundError, IsADirectoryError) as e:
+            raise FileNotFoundError(f"File not found at path: {file_path}") from e
+
+        with f:
+            # aiohttp streams the file object into the multipart body
+            form = aiohttp.FormData()
+            form.add_field('file', f, filename=path.name, content_type=mime_type)
+            async with self._get_session().post(url, data=form,
+                                                headers={"Accept": "application/json"}) as response:
+                response.raise_for_status()
+                return _json_loads(await response.read())
+
+    async def delete_file(self, file_id: str) -> None:
+        """
+        Deletes a previously uploaded file from the server.
+        """
+        url = f"{self.base_url}/api/v1/files/{file_id}"
+        async with self._get_session().delete(url) as response:
+            response.raise_for_status()
+
+    @asynccontextmanager
+    async def upload_and_manage_files(self, file_paths: List[str],
+                                      max_concurrency: int = _MAX_WORKERS,
+                                      verbose: bool = False
+                                      ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        An async context manager to upload files concurrently and ensure they
+        are deleted afterward.
+
+        Up to max_concurrency files are uploaded, and later deleted, at once.
+        Each deletion is logged to this module's logger. With verbose=True,
+        a summary of the cleanup is also printed once it is complete.
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def bounded(coro):
+            async with semaphore:
+                return await coro
+
+        uploaded_file_data = []
+        try:
+            results = await asyncio.gather(*(bounded(self.upload_file(path)) for path in file_paths),
+                                           return_exceptions=True)
+            # Keep every successful upload, so it is cleaned up even if
+            # another one failed, then re-raise the first failure.
+            uploaded_file_data.extend(r for r in results if not isinstance(r, BaseException))
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            yield uploaded_file_data
+        finally:
+            if uploaded_file_data:
+                messages = await asyncio.gather(
+                    *(bounded(self._safe_delete(file_data)) for file_data in uploaded_file_data))
+                if verbose:
+                    print("\n".join(["\nCleaning up temporary files from server...",
+                                     *filter(None, messages)]))
+
+    async def _safe_delete(self, file_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Deletes an uploaded file, reporting failures instead of raising them.
+
+        Returns a line describing the outcome, or None if the file has no ID.
+        """
+        file_id = file_data.get('id')
+        if not file_id:
+            return None
+        try:
+            await self.delete_file(file_id)
+        except aiohttp.ClientError as e:
+            logger.warning("Failed to delete file %s: %s", file_id, e)
+            return f"  - WARNING: Failed to delete file {file_id}: {e}"
+        # Use 'filename' as that is what the API returns
+        filename = file_data.get('filename', 'Unknown Filename')
+        logger.info("Deleted file %s (ID: %s)", filename, file_id)
+        return f"  - Deleted: {filename} (ID: {file_id})"
+
+    async def chat_completion(self, model: str, messages: List[Dict[str, Any]],
+                              temperature: float = 0.7, max_tokens: Optional[int] = None,
+                              response_format: Optional[Dict[str, Any]] = None,
+                              uploaded_files: Optional[List[Dict[str, Any]]] = None,
+                              uploaded_file_refs: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Sends a request for a standard chat completion, with optional file attachments.
+
+        Files are given either as upload records (uploaded_files), or as
+        ready-made {'id': ..., 'type': 'file'} references (uploaded_file_refs).
+        """
+        url = f"{self.base_url}/api/chat/completions"
+        payload = _chat_payload(model, messages, temperature, False, max_tokens=max_tokens,
+                                response_format=response_format, uploaded_files=uploaded_files,
+                                uploaded_file_refs=uploaded_file_refs)
+
+        body = _async_body(_chat_body(payload))
+        async with self._get_session().post(url, data=body, headers=_JSON_HEADERS) as response:
+            response.raise_for_status()
+            return _json_loads(await response.read())
+
+    async def stream_chat_completion(self, model: str, messages: List[Dict[str, Any]],
+                                     temperature: float = 0.7,
+                                     response_format: Optional[Dict[str, Any]] = None,
+                                     uploaded_files: Optional[List[Dict[str, Any]]] = None,
+                                     uploaded_file_refs: Optional[List[Dict[str, Any]]] = None,
+                                     parser: Optional[Callable[[bytes], Any]] = None
+                                     ) -> AsyncIterator[Any]:
+        """
+        Sends a request for a streaming chat completion, with optional file attachments.
+
+        Files are given either as upload records (uploaded_files), or as
+        ready-made {'id': ..., 'type': 'file'} references (uploaded_file_refs).
+
+        Each event's raw JSON bytes are passed to parser, and its results are
+        yielded. By default, every event is parsed into a dictionary.
+        """
+        if parser is None:
+            parser = _json_loads
+        url = f"{self.base_url}/api/chat/completions"
+        payload = _chat_payload(model, messages, temperature, True,
+                                response_format=response_format, uploaded_files=uploaded_files,
+                                uploaded_file_refs=uploaded_file_refs)
+
+        body = _async_body(_chat_body(payload))
+        async with self._get_session().post(url, data=body, headers=_JSON_HEADERS) as response:
+            response.raise_for_status()
+            # Parse the SSE stream on raw bytes, like the synchronous client
+            async for line in _iter_lines(response.content):
+                event = _parse_sse_line(line, parser)
+                if event is _SSE_DONE:
+                    break
+                if event is not _SSE_SKIP:
+                    yield event
+
+    async def stream_chat_completion_text(self, model: str, messages: List[Dict[str, Any]],
+                                          temperature: float = 0.7,
+                                          response_format: Optional[Dict[str, Any]] = None,
+                                          uploaded_files: Optional[List[Dict[str, Any]]] = None,
+                                          uploaded_file_refs: Optional[List[Dict[str, Any]]] = None
+                                          ) -> AsyncIterator[str]:
+        """
+        Streams a chat completion, yielding only the generated text pieces.
+
+        It picks the text out of each event like the synchronous client does.
+        """
+        async for content in self.stream_chat_completion(
+                model, messages, temperature=temperature, response_format=response_format,
+                uploaded_files=uploaded_files, uploaded_file_refs=uploaded_file_refs,
+                parser=_extract_delta_content):
+            if content:
+                yield content
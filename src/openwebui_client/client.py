@@ -12,53 +12,363 @@ as they are attached at the top level of an API request.
 
 import requests
 import json
+import logging
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Iterator
+from typing import Dict, List, Any, Callable, Optional, Iterable, Iterator, Union
 from contextlib import contextmanager
+from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase
+from urllib3.util.retry import Retry
+
+try:
+    # Faster JSON encoding and parsing. orjson.dumps returns UTF-8 bytes and,
+    # like json.loads, orjson.loads accepts bytes directly.
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+try:
+    # Streams multipart uploads instead of building the whole body in memory
+    from requests_toolbelt.multipart.encoder import MultipartEncoder, MultipartEncoderMonitor
+except ImportError:
+    MultipartEncoder = MultipartEncoderMonitor = None
+
+try:
+    # Optional HTTP/2 transport for streamed chat completions
+    import httpx
+except ImportError:
+    httpx = None
+
+logger = logging.getLogger(__name__)
+
+# Headers for JSON request bodies serialized by the client itself
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Upper bound on the number of files uploaded or deleted concurrently
+_MAX_WORKERS = 8
+
+# Socket read size for streamed responses. Chunked SSE responses are still
+# yielded as soon as each HTTP chunk arrives, so this does not delay tokens.
+_STREAM_CHUNK_SIZE = 8192
+
+
+def _chat_payload(model: str, messages: List[Dict[str, Any]], temperature: float, stream: bool,
+                  max_tokens: Optional[int] = None,
+                  response_format: Optional[Dict[str, Any]] = None,
+                  uploaded_files: Optional[List[Dict[str, Any]]] = None,
+                  uploaded_file_refs: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Builds the request payload for a chat completion."""
+    payload = {"model": model, "messages": messages, "temperature": temperature, "stream": stream}
+    if max_tokens is not None:
+        payload["max_tokens"] = max_tokens
+    if response_format is not None:
+        payload["response_format"] = response_format
+    if uploaded_files:
+        payload['files'] = [{'id': f['id'], 'type': 'file'} for f in uploaded_files]
+    if uploaded_file_refs:
+        # Already in request form, so used as given
+        if 'files' in payload:
+            payload['files'].extend(uploaded_file_refs)
+        else:
+            payload['files'] = uploaded_file_refs
+    return payload
+
+
+def _iter_json(payload: Dict[str, Any]) -> Iterator[bytes]:
+    """Serializes a chat payload as JSON piece by piece, one message at a time."""
+    separator = b'{'
+    for key, value in payload.items():
+        yield separator + _json_dumps(key) + b':'
+        separator = b','
+        if key == 'messages':
+            message_separator = b'['
+            for message in value:
+                yield message_separator + _json_dumps(message)
+                message_separator = b','
+            yield b']' if message_separator == b',' else b'[]'
+        else:
+            yield _json_dumps(value)
+    yield b'}' if separator == b',' else b'{}'
+
+
+def _chat_body(payload: Dict[str, Any]) -> Union[bytes, Iterator[bytes]]:
+    """
+    Serializes a chat payload into a request body.
+
+    Payloads with multimodal messages embed base64 images and can be very
+    large. They are returned as a generator, which is sent with chunked
+    transfer encoding. The body then goes out while later messages are
+    still being serialized, and never sits in memory as a whole.
+    """
+    if any(isinstance(message.get('content'), list) for message in payload['messages']):
+        return _iter_json(payload)
+    return _json_dumps(payload)
+
+
+def _feed_lines(pending: bytearray, chunk: bytes) -> List[bytes]:
+    """
+    Splits the next chunk of a byte stream into its complete lines.
+
+    Lines end in LF, CR or CRLF, as in SSE. A trailing partial line is held
+    in pending until a later chunk completes it. Collecting it in a
+    bytearray keeps long lines spread over many chunks, such as large RAG
+    source events, linear to assemble.
+    """
+    lines = chunk.splitlines()
+    partial = lines.pop() if lines and chunk[-1:] not in (b'\n', b'\r') else None
+    if lines and pending:
+        pending += lines[0]
+        lines[0] = bytes(pending)
+        del pending[:]
+    if partial is not None:
+        pending += partial
+    return lines
+
+
+def _split_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Splits a stream of byte chunks into lines, like requests' iter_lines()."""
+    pending = bytearray()
+    for chunk in chunks:
+        yield from _feed_lines(pending, chunk)
+    if pending:
+        yield bytes(pending)
+
+
+def _parse_delta_content(data: bytes) -> Optional[str]:
+    """Returns the text of a streamed chat completion event, or None if it has none."""
+    event = _json_loads(data)
+    choices = event.get('choices') if isinstance(event, dict) else None
+    if not choices:
+        return None
+    return choices[0].get('delta', {}).get('content')
+
+
+def _scan_delta_content(data: bytes) -> Optional[str]:
+    """
+    Like _parse_delta_content(), but slices plain text deltas straight out
+    of the raw event bytes. Events with escape sequences or an unexpected
+    layout fall back to a full parse.
+    """
+    # Only take the fast path when the delta is a direct member of the first
+    # choice, and its text is its first member or follows the role.
+    choices = data.find(b'"choices":[{')
+    if choices != -1 and data.find(b'{', 1, choices) == data.find(b'[', 0, choices) == -1:
+        choices += len(b'"choices":[{')
+        delta = data.find(b'"delta":{', choices)
+        if delta != -1 and data.find(b'{', choices, delta) == -1:
+            start = delta + len(b'"delta":{')
+            if data.startswith(b'"role":"assistant",', start):
+                start += len(b'"role":"assistant",')
+            if data.startswith(b'"content":"', start):
+                start += len(b'"content":"')
+                end = data.find(b'"', start)
+                if end != -1 and data.find(b'\\', start, end) == -1:
+                    return data[start:end].decode('utf-8')
+
+    return _parse_delta_content(data)
+
+
+# orjson parses a whole event faster than the byte scan takes, so the scan
+# only pays off with the stdlib json fallback.
+_extract_delta_content = _scan_delta_content if _json_loads is json.loads else _parse_delta_content
+
+
+# Markers returned by _parse_sse_line() for lines that carry no event
+_SSE_SKIP = object()
+_SSE_DONE = object()
+
+
+def _parse_sse_line(line: bytes, parser: Callable[[bytes], Any]) -> Any:
+    """
+    Parses one line of a chat completion server-sent event stream.
+
+    Returns the parsed event, _SSE_DONE at the end of the stream, or
+    _SSE_SKIP for blank keep-alive lines, other SSE fields and data that
+    could not be decoded.
+    """
+    # Work on the raw bytes, so lines need no UTF-8 decode first
+    if not line.startswith(b'data:'):
+        return _SSE_SKIP
+    # The SSE format makes the space after 'data:' optional
+    data = line[6:] if line[5:6] == b' ' else line[5:]
+    # No JSON event starts with '[DONE]', so a prefix check suffices and
+    # spares a strip() on every line. Trailing whitespace is tolerated.
+    if data.startswith(b'[DONE]'):
+        return _SSE_DONE
+    try:
+        return parser(data)
+    except json.JSONDecodeError:
+        print(f"\nWarning: Could not decode JSON chunk: {data.decode('utf-8', 'replace')}\n")
+        return _SSE_SKIP
+
+
+def _iter_sse_events(lines: Iterable[bytes],
+                     parser: Callable[[bytes], Any] = _json_loads) -> Iterator[Any]:
+    """Parses the events of a chat completion server-sent event stream."""
+    for line in lines:
+        event = _parse_sse_line(line, parser)
+        if event is _SSE_DONE:
+            break
+        if event is not _SSE_SKIP:
+            yield event
+
+
+class _BearerAuth(AuthBase):
+    """Attaches the API key as a bearer token to every request of a session."""
+
+    def __init__(self, header: str):
+        # The formatted header value, so it is not rebuilt for every request
+        self.header = header
+
+    def __call__(self, r: requests.PreparedRequest) -> requests.PreparedRequest:
+        r.headers["Authorization"] = self.header
+        return r
 
 
 class OpenWebUIClient:
     """
     A client for interacting with the Open WebUI REST API.
+
+    The client keeps its connections open between requests. Call close(),
+    or use the client as a context manager, to release them when done:
+
+        with OpenWebUIClient(base_url, api_key, http2=True) as client:
+            for chunk in client.stream_chat_completion(model, messages):
+                ...
     """
 
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(self, base_url: str, api_key: str, http2: bool = False,
+                 max_connections: int = 32):
+        """
+        Initializes the client.
+
+        Args:
+            base_url: The base URL of the Open WebUI instance.
+            api_key: The API key used to authenticate requests.
+            http2: Stream chat completions over an HTTP/2 connection using
+                   httpx, so concurrent streams share one connection. Requires
+                   the 'http2' extra and an HTTP/2 capable server.
+            max_connections: The number of connections kept open to the
+                             server for concurrent requests.
+        """
         self.base_url = base_url.rstrip('/')
+        self._auth_header = f"Bearer {api_key}"
         self.session = requests.Session()
-        self.session.headers.update({
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        })
+        # An explicit auth handler also keeps requests from looking up
+        # credentials in ~/.netrc for every request.
+        self.session.auth = _BearerAuth(self._auth_header)
+        # Keep enough pooled connections around for concurrent requests, and
+        # retry idempotent requests (not POSTs) on transient gateway errors.
+        # raise_on_status=False hands the last error response back to the
+        # caller, so raise_for_status() still raises an HTTPError. Retry-After
+        # is ignored, as its delay is not capped and a large value would stall
+        # calls such as the deletes in upload_and_manage_files' cleanup.
+        retries = Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                        raise_on_status=False, respect_retry_after_header=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections, max_retries=retries)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Model list and its ETag from the last get_models() call
+        self._models_etag: Optional[str] = None
+        self._models_cache: List[Dict[str, Any]] = []
+
+        self._http2_client = None
+        if http2:
+            if httpx is None:
+                raise ImportError("HTTP/2 support requires httpx: pip install 'openwebui-client[http2]'")
+            self._http2_client = httpx.Client(
+                http2=True, timeout=None, headers={"Authorization": self._auth_header},
+                limits=httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_connections))
+
+    def __enter__(self) -> 'OpenWebUIClient':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Closes the underlying connection pools."""
+        self.session.close()
+        if self._http2_client is not None:
+            self._http2_client.close()
 
     def get_models(self) -> List[Dict[str, Any]]:
-        """Retrieves a list of available models from the API."""
+        """
+        Retrieves a list of available models from the API.
+
+        If the server sent an ETag for the list, later calls revalidate it
+        with a conditional request and reuse the list on a 304 response.
+        """
         url = f"{self.base_url}/api/models"
-        response = self.session.get(url)
+        headers = {}
+        if self._models_etag is not None:
+            headers["If-None-Match"] = self._models_etag
+        response = self.session.get(url, headers=headers)
+        if response.status_code == 304 and self._models_etag is not None:
+            return list(self._models_cache)
         response.raise_for_status()
-        data = response.json()
-        return data.get('data', [])
+        data = _json_loads(response.content)
+        models = data.get('data', [])
+        self._models_etag = response.headers.get('ETag')
+        self._models_cache = models
+        return list(models)
 
-    def upload_file(self, file_path: str) -> Dict[str, Any]:
+    def upload_file(self, file_path: str,
+                    progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
         """
         Uploads a file to be referenced in chat completions.
+
+        Args:
+            file_path: The local path of the file to upload.
+            progress_callback: An optional callable receiving the number of
+                               bytes sent so far and the total body size. It is
+                               called as the upload progresses when
+                               requests-toolbelt is installed, and once after
+                               the upload otherwise.
         """
         path = Path(file_path)
-        if not path.is_file():
-            raise FileNotFoundError(f"File not found at path: {file_path}")
 
         url = f"{self.base_url}/api/v1/files/"
 
+        # Go through the session to reuse its pooled connection and its
+        # authentication. The session sets no default Content-Type, so
+        # requests sets the multipart boundary itself.
         headers = {
-            "Authorization": self.session.headers["Authorization"],
             "Accept": "application/json"
         }
 
-        with open(path, "rb") as f:
-            files_payload = {'file': f}
-            response = requests.post(url, headers=headers, files=files_payload)
+        # Let open() report a missing file instead of checking with a stat() first
+        try:
+            f = open(path, "rb")
+        except (FileNotFoundError, IsADirectoryError) as e:
+            raise FileNotFoundError(f"File not found at path: {file_path}") from e
+
+        with f:
+            if MultipartEncoder is not None:
+                mime_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+                encoder = MultipartEncoder(fields={'file': (path.name, f, mime_type)})
+                headers["Content-Type"] = encoder.content_type
+                body = encoder
+                if progress_callback is not None:
+                    body = MultipartEncoderMonitor(
+                        encoder, lambda monitor: progress_callback(monitor.bytes_read, monitor.len))
+                response = self.session.post(url, headers=headers, data=body)
+            else:
+                files_payload = {'file': f}
+                response = self.session.post(url, headers=headers, files=files_payload)
+                if progress_callback is not None:
+                    body_size = len(response.request.body)
+                    progress_callback(body_size, body_size)
 
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
 
     def delete_file(self, file_id: str) -> None:
         """
@@ -69,77 +379,139 @@ class OpenWebUIClient:
         response.raise_for_status()
 
     @contextmanager
-    def upload_and_manage_files(self, file_paths: List[str]) -> Iterator[List[Dict[str, Any]]]:
+    def upload_and_manage_files(self, file_paths: List[str],
+                                max_concurrency: int = _MAX_WORKERS,
+                                verbose: bool = False) -> Iterator[List[Dict[str, Any]]]:
         """
         A context manager to upload files and ensure they are deleted afterward.
+
+        Up to max_concurrency files are uploaded, and later deleted, at once.
+        Each deletion is logged to this module's logger. With verbose=True,
+        a summary of the cleanup is also printed once it is complete.
         """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
         uploaded_file_data = []
         try:
-            for path in file_paths:
-                uploaded_file_data.append(self.upload_file(path))
+            if file_paths:
+                with ThreadPoolExecutor(max_workers=min(max_concurrency, len(file_paths))) as executor:
+                    futures = [executor.submit(self.upload_file, path) for path in file_paths]
+                # Keep every successful upload, so it is cleaned up even if
+                # another one failed, then re-raise the first failure.
+                for future in futures:
+                    if future.exception() is None:
+                        uploaded_file_data.append(future.result())
+                for future in futures:
+                    future.result()
             yield uploaded_file_data
         finally:
-            if not uploaded_file_data:
-                return
-
-            print("\nCleaning up temporary files from server...")
-            for file_data in uploaded_file_data:
-                file_id = file_data.get('id')
-                if file_id:
-                    try:
-                        self.delete_file(file_id)
-                        # Use 'filename' as that is what the API returns
-                        filename = file_data.get('filename', 'Unknown Filename')
-                        print(f"  - Deleted: {filename} (ID: {file_id})")
-                    except requests.exceptions.RequestException as e:
-                        print(f"  - WARNING: Failed to delete file {file_id}: {e}")
+            # No return in here, as that would swallow the exception in flight
+            if uploaded_file_data:
+                if len(uploaded_file_data) == 1:
+                    messages = [self._safe_delete(uploaded_file_data[0])]
+                else:
+                    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(uploaded_file_data))) as executor:
+                        messages = list(executor.map(self._safe_delete, uploaded_file_data))
+                if verbose:
+                    # Print the whole summary in one write rather than line by line
+                    print("\n".join(["\nCleaning up temporary files from server...",
+                                     *filter(None, messages)]))
+
+    def _safe_delete(self, file_data: Dict[str, Any]) -> Optional[str]:
+        """
+        Deletes an uploaded file, reporting failures instead of raising them.
+
+        Returns a line describing the outcome, or None if the file has no ID.
+        """
+        file_id = file_data.get('id')
+        if not file_id:
+            return None
+        try:
+            self.delete_file(file_id)
+        except requests.exceptions.RequestException as e:
+            logger.warning("Failed to delete file %s: %s", file_id, e)
+            return f"  - WARNING: Failed to delete file {file_id}: {e}"
+        # Use 'filename' as that is what the API returns
+        filename = file_data.get('filename', 'Unknown Filename')
+        logger.info("Deleted file %s (ID: %s)", filename, file_id)
+        return f"  - Deleted: {filename} (ID: {file_id})"
 
     def chat_completion(self, model: str, messages: List[Dict[str, Any]],
                         temperature: float = 0.7, max_tokens: Optional[int] = None,
                         response_format: Optional[Dict[str, Any]] = None, # <-- ADDED PARAMETER
-                        uploaded_files: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+                        uploaded_files: Optional[List[Dict[str, Any]]] = None,
+                        uploaded_file_refs: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Sends a request for a standard chat completion, with optional file attachments.
+
+        Files are given either as upload records (uploaded_files), or as
+        ready-made {'id': ..., 'type': 'file'} references (uploaded_file_refs).
         """
         url = f"{self.base_url}/api/chat/completions"
-        payload = {"model": model, "messages": messages, "temperature": temperature, "stream": False}
-        if max_tokens is not None:
-            payload["max_tokens"] = max_tokens
-        if response_format is not None:
-            payload["response_format"] = response_format
-        if uploaded_files:
-            payload['files'] = [{'id': f['id'], 'type': 'file'} for f in uploaded_files]
-
-        response = self.session.post(url, json=payload)
+        payload = _chat_payload(model, messages, temperature, False, max_tokens=max_tokens,
+                                response_format=response_format, uploaded_files=uploaded_files,
+                                uploaded_file_refs=uploaded_file_refs)
+
+        response = self.session.post(url, data=_chat_body(payload), headers=_JSON_HEADERS)
         response.raise_for_status()
-        return response.json()
+        # Parse the raw body, which skips requests' charset detection and
+        # text decoding. Like orjson, json.loads accepts UTF-8 bytes.
+        return _json_loads(response.content)
 
     def stream_chat_completion(self, model: str, messages: List[Dict[str, Any]],
                                temperature: float = 0.7,
                                response_format: Optional[Dict[str, Any]] = None, # <-- ADDED PARAMETER
-                               uploaded_files: Optional[List[Dict[str, Any]]] = None) -> Iterator[Dict[str, Any]]:
+                               uploaded_files: Optional[List[Dict[str, Any]]] = None,
+                               uploaded_file_refs: Optional[List[Dict[str, Any]]] = None,
+                               parser: Optional[Callable[[bytes], Any]] = None) -> Iterator[Any]:
         """
         Sends a request for a streaming chat completion, with optional file attachments.
+
+        Files are given either as upload records (uploaded_files), or as
+        ready-made {'id': ..., 'type': 'file'} references (uploaded_file_refs).
+
+        Each event's raw JSON bytes are passed to parser, and its results are
+        yielded. By default, every event is parsed into a dictionary.
+
+        When the client was created with http2=True, the request is sent over
+        httpx and HTTP errors are raised as httpx.HTTPStatusError.
         """
+        if parser is None:
+            parser = _json_loads
         url = f"{self.base_url}/api/chat/completions"
-        payload = {"model": model, "messages": messages, "temperature": temperature, "stream": True}
-        if response_format is not None:
-            payload["response_format"] = response_format
-        if uploaded_files:
-            payload['files'] = [{'id': f['id'], 'type': 'file'} for f in uploaded_files]
+        payload = _chat_payload(model, messages, temperature, True,
+                                response_format=response_format, uploaded_files=uploaded_files,
+                                uploaded_file_refs=uploaded_file_refs)
+        body = _chat_body(payload)
+
+        if self._http2_client is not None:
+            with self._http2_client.stream("POST", url, content=body, headers=_JSON_HEADERS) as response:
+                response.raise_for_status()
+                # iter_bytes() without a chunk size yields data as it arrives
+                yield from _iter_sse_events(_split_lines(response.iter_bytes()), parser)
+            return
 
-        with self.session.post(url, json=payload, stream=True) as response:
+        with self.session.post(url, data=body, headers=_JSON_HEADERS, stream=True) as response:
             response.raise_for_status()
-            for line in response.iter_lines():
-                if not line:
-                    continue
-                line_str = line.decode('utf-8')
-                if line_str.startswith('data: '):
-                    data_str = line_str[6:]
-                    if data_str.strip() == '[DONE]':
-                        break
-                    try:
-                        yield json.loads(data_str)
-                    except json.JSONDecodeError:
-                        print(f"\nWarning: Could not decode JSON chunk: {data_str}\n")
-                        continue
+            yield from _iter_sse_events(
+                response.iter_lines(chunk_size=_STREAM_CHUNK_SIZE, decode_unicode=False), parser)
+
+    def stream_chat_completion_text(self, model: str, messages: List[Dict[str, Any]],
+                                    temperature: float = 0.7,
+                                    response_format: Optional[Dict[str, Any]] = None,
+                                    uploaded_files: Optional[List[Dict[str, Any]]] = None,
+                                    uploaded_file_refs: Optional[List[Dict[str, Any]]] = None
+                                    ) -> Iterator[str]:
+        """
+        Streams a chat completion, yielding only the generated text pieces.
+
+        Without orjson installed, most events are not parsed into
+        dictionaries at all, which makes this cheaper than
+        stream_chat_completion when only the text is needed.
+        """
+        for content in self.stream_chat_completion(
+                model, messages, temperature=temperature, response_format=response_format,
+                uploaded_files=uploaded_files, uploaded_file_refs=uploaded_file_refs,
+                parser=_extract_delta_content):
+            if content:
+                yield content
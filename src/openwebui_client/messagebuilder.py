@@ -10,10 +10,115 @@ File uploads are handled by the OpenWebUIClient, not the message builder,
 as they are attached at the top level of an API request.
 """
 
-import base64
+import functools
 import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Optional
+
+try:
+    # SIMD-accelerated drop-in replacement for the stdlib base64 module
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# Upper bound on the number of images encoded concurrently
+_MAX_WORKERS = 8
+
+# Read size for streaming base64 encoding. Must be a multiple of 3 so that no
+# padding is emitted in the middle of the encoded output.
+_B64_CHUNK_SIZE = 57 * 1024
+
+
+def _b64_encode_file(path: Path, prefix: bytes = b"") -> bytearray:
+    """
+    Base64-encodes a file chunk by chunk, without reading it into memory at once.
+
+    Args:
+        path: The path of the file to encode.
+        prefix: Bytes to place in front of the encoded content.
+
+    Returns:
+        The prefix followed by the base64-encoded file content.
+    """
+    chunk = bytearray(_B64_CHUNK_SIZE)
+    view = memoryview(chunk)
+    with open(path, "rb") as f:
+        # Size the output for the whole file up front and reuse one read
+        # buffer, so neither grows nor gets reallocated while encoding.
+        size = os.fstat(f.fileno()).st_size
+        encoded = bytearray(len(prefix) + 4 * ((size + 2) // 3))
+        encoded[:len(prefix)] = prefix
+        pos = len(prefix)
+        while True:
+            # A buffered readinto() only returns a partial chunk at EOF
+            n = f.readinto(chunk)
+            if not n:
+                break
+            block = base64.b64encode(view[:n])
+            encoded[pos:pos + len(block)] = block
+            pos += len(block)
+    # Trim the surplus, in case the file shrank while it was being read
+    del encoded[pos:]
+    return encoded
+
+
+# MIME types of common image formats, looked up without the mimetypes module
+_IMAGE_MIME_TYPES = {
+    '.png': 'image/png',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.bmp': 'image/bmp',
+}
+
+
+@functools.lru_cache(maxsize=64)
+def _guess_image_mime(suffix: str) -> Optional[str]:
+    """
+    Guesses the MIME type for a file suffix, caching the result per suffix.
+
+    Common image suffixes are resolved from a fixed table, which avoids
+    the mimetypes module reading the system MIME databases on first use.
+    Other suffixes still fall back to mimetypes.
+
+    Args:
+        suffix: The lower-cased file suffix, including the leading dot.
+
+    Returns:
+        The guessed MIME type, or None if it could not be determined.
+    """
+    mime_type = _IMAGE_MIME_TYPES.get(suffix)
+    if mime_type is None:
+        mime_type = mimetypes.guess_type("x" + suffix)[0]
+    return mime_type
+
+
+def _image_content_part(image_path: str, mime_type: str) -> Dict[str, Any]:
+    """
+    Encodes an image file into an 'image_url' message content part.
+
+    Args:
+        image_path: The path of the image file.
+        mime_type: The MIME type of the image.
+
+    Returns:
+        The content part embedding the image as a base64 data URI.
+
+    Raises:
+        FileNotFoundError: If the image path is not a readable file.
+    """
+    # Encode the image directly behind the data URI prefix in one buffer and
+    # decode that once, so the encoded image is never copied in between.
+    prefix = f"data:{mime_type};base64,".encode('ascii')
+    try:
+        encoded = _b64_encode_file(Path(image_path), prefix)
+    except (FileNotFoundError, IsADirectoryError) as e:
+        raise FileNotFoundError(f"Image file not found at path: {image_path}") from e
+    image_url = {"url": encoded.decode('ascii')}
+    return {"type": "image_url", "image_url": image_url}
 
 
 class OpenWebUIMessageBuilder:
@@ -25,6 +130,8 @@ class OpenWebUIMessageBuilder:
     file attachments, which are managed by the OpenWebUIClient at the request level.
     """
 
+    __slots__ = ('messages',)
+
     def __init__(self, system_prompt: Optional[str] = None):
         """
         Initializes the message builder.
@@ -66,21 +173,33 @@ class OpenWebUIMessageBuilder:
         Raises:
             FileNotFoundError: If any image path is invalid.
         """
-        content_parts: List[Dict[str, Any]] = [{"type": "text", "text": text}]
-
+        # Check all image types up front, before any image is read. Missing
+        # files surface when they are opened, which saves a stat() per image.
+        paths: List[str] = []
+        mime_types: List[str] = []
         for image_path in image_paths:
             path = Path(image_path)
-            if not path.is_file():
-                raise FileNotFoundError(f"Image file not found at path: {image_path}")
-
-            # Guess MIME type and encode image to Base64
-            mime_type, _ = mimetypes.guess_type(path)
+            mime_type = _guess_image_mime(path.suffix.lower())
             if not mime_type or not mime_type.startswith('image'):
+                # A missing file takes precedence over an unknown type
+                if not path.is_file():
+                    raise FileNotFoundError(f"Image file not found at path: {image_path}")
                 raise ValueError(f"Could not determine a valid image type for {image_path}")
-            with open(path, "rb") as image_file:
-                encoded_string = base64.b64encode(image_file.read()).decode('utf-8')
-            image_url = {"url": f"data:{mime_type};base64,{encoded_string}"}
-            content_parts.append({"type": "image_url", "image_url": image_url})
+            paths.append(image_path)
+            mime_types.append(mime_type)
+
+        # The content list is sized up front: the text prompt, then one part per image
+        content_parts: List[Any] = [None] * (1 + len(paths))
+        content_parts[0] = {"type": "text", "text": text}
+
+        # Encode the images to Base64. File reads and base64 encoding release
+        # the GIL, so several images are encoded in parallel threads.
+        if len(paths) > 1:
+            with ThreadPoolExecutor(max_workers=min(_MAX_WORKERS, len(paths))) as executor:
+                for index, part in enumerate(executor.map(_image_content_part, paths, mime_types), 1):
+                    content_parts[index] = part
+        elif paths:
+            content_parts[1] = _image_content_part(paths[0], mime_types[0])
 
         self.messages.append({"role": "user", "content": content_parts})
         return self
@@ -98,6 +217,20 @@ class OpenWebUIMessageBuilder:
         self.messages.append({"role": "assistant", "content": text})
         return self
 
+    def extend(self, messages: Iterable[Dict[str, Any]]) -> 'OpenWebUIMessageBuilder':
+        """
+        Appends already-built messages in one call, e.g. a stored conversation
+        history or a batch of few-shot examples.
+
+        Args:
+            messages: Message dictionaries, each with a 'role' and 'content'.
+
+        Returns:
+            The builder instance for chaining.
+        """
+        self.messages.extend(messages)
+        return self
+
     def build(self) -> List[Dict[str, Any]]:
         """
         Returns the constructed list of messages.